@@ -1,6 +1,7 @@
 import argparse
 import logging
 
+from .protobuf_backend import warn_if_pure_python_protobuf
 from .pytorch_converter import PyTorchConverter
 from .text_converter import TextConverter
 
@@ -110,6 +111,7 @@ def main() -> None:
 
     if "func" in args:
         setup_logging(args.log_filename)
+        warn_if_pure_python_protobuf("The converter")
         args.func(args)
         logging.info(f"Conversion successful. Output file is available at {args.output}.")
     else:
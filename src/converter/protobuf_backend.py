@@ -0,0 +1,20 @@
+import logging
+
+from google.protobuf.internal import api_implementation
+
+
+def warn_if_pure_python_protobuf(tool: str) -> None:
+    """
+    Warn if the pure-Python protobuf implementation is in use.
+
+    Encoding and decoding Chakra execution traces with the pure-Python implementation is several times slower than with
+    the upb backend, which is selected by default unless PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION overrides it.
+
+    Args:
+        tool (str): Name of the tool to mention in the warning.
+    """
+    if api_implementation.Type() == "python":
+        logging.warning(
+            f"{tool} is using the pure-Python protobuf implementation, which makes it several times slower. "
+            "Unset PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION to use the upb backend."
+        )
@@ -1,6 +1,11 @@
 import json
 import logging
-from typing import IO, Dict, List, Optional, Set, Tuple
+from collections import deque
+from typing import IO, Deque, Dict, FrozenSet, List, Optional, Set, Tuple, Union
+
+import orjson
+from google.protobuf.internal.encoder import _VarintBytes
+from google.protobuf.message import Message
 
 from ...schema.protobuf.et_def_pb2 import (
     ALL_GATHER,
@@ -14,9 +19,7 @@ from ...schema.protobuf.et_def_pb2 import (
     REDUCE_SCATTER,
     GlobalMetadata,
 )
-from ...schema.protobuf.et_def_pb2 import AttributeProto as ChakraAttr
 from ...schema.protobuf.et_def_pb2 import Node as ChakraNode
-from ..third_party.utils.protolib import encodeMessage as encode_message
 from .pytorch_node import PyTorchNode, PyTorchNodeType
 
 
@@ -28,8 +31,21 @@ class PyTorchConverter:
     into the Chakra protobuf format. The input JSON traces are generated by trace_link and lack the proper dependencies
     for simulation. This converter handles the conversion of JSON nodes to protobuf nodes, identification and encoding
     of dependencies, removal of dangling nodes, and writing the final protobuf trace to the output file.
+
+    Attributes
+        ROOT_NODE_NAMES (FrozenSet[str]): Names of the root nodes in Chakra host execution traces.
+        WRITE_BUFFER_SIZE (int): Number of bytes of encoded nodes to accumulate in memory before writing them to the
+            output file.
     """
 
+    ROOT_NODE_NAMES: FrozenSet[str] = frozenset(
+        {
+            "[pytorch|profiler|execution_graph|thread]",
+            "[pytorch|profiler|execution_trace|thread]",
+        }
+    )
+    WRITE_BUFFER_SIZE = 1024 * 1024
+
     def convert(self, input_filename: str, output_filename: str, simulate: bool) -> None:
         """
         Convert Chakra host + device execution traces in JSON format into the Chakra protobuf format.
@@ -41,19 +57,22 @@ class PyTorchConverter:
                 the method will simulate the execution after writing the protobuf trace to the output file.
         """
         json_trace = self.load_json_execution_traces(input_filename)
-        json_metadata, json_node_map = self.parse_json_trace(json_trace)
+        json_metadata, json_node_map, json_node_root_nids = self.parse_json_trace(json_trace)
+        # The PyTorch nodes hold everything needed from here on. Drop the raw JSON nodes so that they can be freed
+        # before the protobuf nodes are created, instead of keeping both alive until the end of the conversion.
+        del json_trace
 
         protobuf_node_map = {}
         self.convert_json_to_protobuf_nodes(json_node_map, protobuf_node_map)
-        root_node_list = [node for node in protobuf_node_map.values() if self.is_root_node(node.name)]
+        root_node_list = [protobuf_node_map[nid] for nid in json_node_root_nids if nid in protobuf_node_map]
         for root_node in root_node_list:
             self.convert_ctrl_dep_to_data_dep(json_node_map, protobuf_node_map, root_node)
 
-        protobuf_node_map = self.remove_dangling_nodes(protobuf_node_map)
-
         parent_to_children_map = self.update_parent_to_children_map(protobuf_node_map)
 
-        self.identify_cyclic_dependencies(protobuf_node_map)
+        protobuf_node_map = self.remove_dangling_nodes(protobuf_node_map, parent_to_children_map)
+
+        self.identify_cyclic_dependencies(protobuf_node_map, parent_to_children_map)
 
         self.write_protobuf_execution_trace(output_filename, json_metadata, protobuf_node_map)
 
@@ -64,6 +83,10 @@ class PyTorchConverter:
         """
         Load Chakra host + device execution traces in JSON format from a file.
 
+        The trace is parsed with orjson, which is considerably faster than the standard json module on large traces.
+        Traces written by Python's json module may contain NaN or Infinity, which orjson rejects. Such traces are
+        parsed with the standard json module instead.
+
         Args:
             input_filename (str): Input Chakra host + device execution trace in the JSON format.
 
@@ -71,10 +94,15 @@ class PyTorchConverter:
             Dict: The loaded Chakra host + device execution trace data.
         """
         logging.debug(f"Loading Chakra host + device execution traces in JSON format from file: {input_filename}")
-        with open(input_filename, "r") as json_file:
-            return json.load(json_file)
+        with open(input_filename, "rb") as json_file:
+            json_data = json_file.read()
+        try:
+            return orjson.loads(json_data)
+        except orjson.JSONDecodeError:
+            logging.debug("orjson failed to parse the trace. Falling back to the json module.")
+            return json.loads(json_data)
 
-    def parse_json_trace(self, json_trace: Dict) -> Tuple[Dict, Dict[int, PyTorchNode]]:
+    def parse_json_trace(self, json_trace: Dict) -> Tuple[Dict, Dict[int, PyTorchNode], List[int]]:
         """
         Parse and instantiate PyTorch nodes from execution trace data.
 
@@ -84,7 +112,7 @@ class PyTorchConverter:
         Extract node information, sort nodes by timestamp, and establish parent-child relationships among them.
 
         Returns:
-            Tuple: A tuple containing JSON metadata and dictionary of PyTorch node objects.
+            Tuple: A tuple containing JSON metadata, dictionary of PyTorch node objects, and list of root node IDs.
         """
         logging.debug("Extracting and processing node data from execution trace.")
 
@@ -105,7 +133,7 @@ class PyTorchConverter:
         json_node_map = {node_data["id"]: PyTorchNode(json_trace["schema"], node_data) for node_data in json_nodes}
         json_node_root_nids = []
         json_node_map = self.establish_parent_child_relationships(json_node_map, json_node_root_nids)
-        return json_metadata, json_node_map
+        return json_metadata, json_node_map, json_node_root_nids
 
     def establish_parent_child_relationships(
         self, json_node_map: Dict[int, PyTorchNode], json_node_root_nids: List[int]
@@ -116,7 +144,8 @@ class PyTorchConverter:
         In Chakra host execution traces, the parent-child relationship is represented in the ctrl dep or parent field.
         The name of the field is determined by the schema version of the Chakra host execution traces. When a function
         calls multiple functions, the callee functions appear as children nodes in the control dependency. This method
-        is responsible for reading such dependencies and updating the field accordingly.
+        is responsible for reading such dependencies and updating the field accordingly. Children are sorted by node
+        ID once here, so that later traversals can visit them in execution order without sorting again.
 
         Args:
             json_node_map (Dict[int, PyTorchNode]): Dictionary of JSON node objects.
@@ -125,34 +154,40 @@ class PyTorchConverter:
         Returns:
             Dict[int, PyTorchNode]: Dictionary of JSON nodes with established relationships.
         """
-        node_type_counts = {
-            "total_op": 0,
-            "cpu_op": 0,
-            "gpu_op": 0,
-            "record_param_comms_op": 0,
-            "nccl_op": 0,
-            "root_op": 0,
-        }
+        num_cpu_ops = num_gpu_ops = num_record_param_comms_ops = num_nccl_ops = num_root_ops = 0
 
         for json_node in json_node_map.values():
+            # Classify each node once and reuse the result for both the relationships and the statistics.
+            is_gpu_op = json_node.is_gpu_op()
+            is_record_param_comms_op = json_node.is_record_param_comms_op()
+            is_nccl_op = json_node.is_nccl_op()
+
             parent_id = json_node.parent
             if parent_id in json_node_map:
-                self.process_parent_child_relationships(json_node_map, json_node, parent_id)
+                self.process_parent_child_relationships(
+                    json_node_map, json_node, parent_id, is_gpu_op, is_record_param_comms_op, is_nccl_op
+                )
 
             if self.is_root_node(json_node.name):
                 json_node_root_nids.append(json_node.id)
-                node_type_counts["root_op"] += 1
-
-            node_type_counts["total_op"] += 1
-            if json_node.is_cpu_op():
-                node_type_counts["cpu_op"] += 1
-            if json_node.is_gpu_op():
-                node_type_counts["gpu_op"] += 1
-            if json_node.is_record_param_comms_op():
-                node_type_counts["record_param_comms_op"] += 1
-            if json_node.is_nccl_op():
-                node_type_counts["nccl_op"] += 1
+                num_root_ops += 1
+
+            num_cpu_ops += json_node.is_cpu_op()
+            num_gpu_ops += is_gpu_op
+            num_record_param_comms_ops += is_record_param_comms_op
+            num_nccl_ops += is_nccl_op
 
+        for json_node in json_node_map.values():
+            json_node.children.sort(key=lambda child: child.id)
+
+        node_type_counts = {
+            "total_op": len(json_node_map),
+            "cpu_op": num_cpu_ops,
+            "gpu_op": num_gpu_ops,
+            "record_param_comms_op": num_record_param_comms_ops,
+            "nccl_op": num_nccl_ops,
+            "root_op": num_root_ops,
+        }
         for node_type, count in node_type_counts.items():
             logging.debug(f"{node_type}: {count}")
 
@@ -168,8 +203,8 @@ class PyTorchConverter:
         nodes should be identified during the process of conversion.
 
         Chakra host execution traces may have multiple root nodes. These root nodes can be identified with specific
-        keywords as shown in this method. Identifying root nodes is essential for correctly converting and representing
-        the execution trace in the Chakra protobuf format.
+        keywords listed in ROOT_NODE_NAMES. Identifying root nodes is essential for correctly converting and
+        representing the execution trace in the Chakra protobuf format.
 
         Args:
             node_name (str): The name of the node to check.
@@ -177,13 +212,16 @@ class PyTorchConverter:
         Returns:
             bool: True if the node name corresponds to a root node, False otherwise.
         """
-        return node_name in [
-            "[pytorch|profiler|execution_graph|thread]",
-            "[pytorch|profiler|execution_trace|thread]",
-        ]
+        return node_name in self.ROOT_NODE_NAMES
 
     def process_parent_child_relationships(
-        self, json_node_map: Dict[int, PyTorchNode], json_node: PyTorchNode, parent_id: int
+        self,
+        json_node_map: Dict[int, PyTorchNode],
+        json_node: PyTorchNode,
+        parent_id: int,
+        is_gpu_op: bool,
+        is_record_param_comms_op: bool,
+        is_nccl_op: bool,
     ) -> None:
         """
         Process the parent-child relationships for Chakra JSON nodes.
@@ -192,20 +230,23 @@ class PyTorchConverter:
             json_node_map (Dict[int, PyTorchNode]): Dictionary of JSON node objects.
             json_node (PyTorchNode): The current JSON node being processed.
             parent_id (int): The ID of the parent node.
+            is_gpu_op (bool): Whether the current node is a GPU operator.
+            is_record_param_comms_op (bool): Whether the current node is a record_param_comms operator.
+            is_nccl_op (bool): Whether the current node is a NCCL operator.
         """
         parent_node = json_node_map[parent_id]
         parent_node.add_child(json_node)
 
-        if json_node.is_gpu_op():
+        if is_gpu_op:
             parent_node.add_gpu_child(json_node)
 
-        if json_node.is_record_param_comms_op():
+        if is_record_param_comms_op:
             # Add the record_param_comms node to the parent.
             # These operators act as metadata operators between the launcher and the actual communication operator.
             # This registration allows the converter to easily identify the communication operator to use.
             parent_node.record_param_comms_node = json_node
 
-        if json_node.is_nccl_op():
+        if is_nccl_op:
             # Add the NCCL node to the parent.
             # NCCL operators are actual communication operators.
             # This registration allows the converter to easily identify the communication operator to use.
@@ -224,33 +265,26 @@ class PyTorchConverter:
             json_node_map (Dict[int, PyTorchNode]): Dictionary of JSON nodes to be converted.
             protobuf_node_map (Dict[int, ChakraNode]): Dictionary where the converted Protobuf nodes will be stored.
         """
-        for _, json_node in json_node_map.items():
-            if (json_node.get_op_type() == PyTorchNodeType.CPU_OP) or (
-                json_node.get_op_type() == PyTorchNodeType.LABEL
-            ):
+        cpu_op_type, label_op_type = PyTorchNodeType.CPU_OP, PyTorchNodeType.LABEL
+        for json_node in json_node_map.values():
+            op_type = json_node.get_op_type()
+            if op_type is cpu_op_type or op_type is label_op_type:
                 chakra_node = self.convert_json_to_protobuf_node(json_node_map, protobuf_node_map, json_node)
                 protobuf_node_map[chakra_node.id] = chakra_node
 
                 for pytorch_gpu_node in json_node.gpu_children:
+                    pytorch_gpu_node.share_serialized_io(json_node)
                     chakra_gpu_node = self.convert_json_to_protobuf_node(
                         json_node_map, protobuf_node_map, pytorch_gpu_node
                     )
 
                     if chakra_gpu_node.type == COMM_COLL_NODE:
                         collective_comm_type = self.get_collective_comm_type(pytorch_gpu_node.name)
-                        chakra_gpu_node.attr.extend(
-                            [
-                                ChakraAttr(name="comm_type", int64_val=collective_comm_type),
-                                ChakraAttr(name="comm_size", int64_val=pytorch_gpu_node.comm_size),
-                            ]
-                        )
+                        chakra_gpu_node.attr.add(name="comm_type", int64_val=collective_comm_type)
+                        chakra_gpu_node.attr.add(name="comm_size", int64_val=pytorch_gpu_node.comm_size)
 
                     elif chakra_gpu_node.type in {COMM_SEND_NODE, COMM_RECV_NODE}:
-                        chakra_gpu_node.attr.extend(
-                            [
-                                ChakraAttr(name="comm_size", int64_val=pytorch_gpu_node.comm_size),
-                            ]
-                        )
+                        chakra_gpu_node.attr.add(name="comm_size", int64_val=pytorch_gpu_node.comm_size)
 
                     protobuf_node_map[chakra_gpu_node.id] = chakra_gpu_node
 
@@ -276,7 +310,8 @@ class PyTorchConverter:
         Returns:
             ChakraNode: The converted protobuf node.
         """
-        logging.debug(f"Converting JSON node ID {json_node.id} to protobuf node.")
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug(f"Converting JSON node ID {json_node.id} to protobuf node.")
 
         protobuf_node = ChakraNode()
         protobuf_node.id = json_node.id
@@ -290,26 +325,30 @@ class PyTorchConverter:
         if "Optimizer.step" in json_node.name:
             protobuf_node.duration_micros = 0
 
-        protobuf_node.inputs.values = str(json_node.inputs["values"])
-        protobuf_node.inputs.shapes = str(json_node.inputs["shapes"])
-        protobuf_node.inputs.types = str(json_node.inputs["types"])
-        protobuf_node.outputs.values = str(json_node.outputs["values"])
-        protobuf_node.outputs.shapes = str(json_node.outputs["shapes"])
-        protobuf_node.outputs.types = str(json_node.outputs["types"])
-        protobuf_node.attr.extend(
-            [
-                ChakraAttr(name="rf_id", int64_val=json_node.rf_id),
-                ChakraAttr(name="fw_parent", int64_val=json_node.fw_parent),
-                ChakraAttr(name="seq_id", int64_val=json_node.seq_id),
-                ChakraAttr(name="scope", int64_val=json_node.scope),
-                ChakraAttr(name="tid", int64_val=json_node.tid),
-                ChakraAttr(name="fw_tid", int64_val=json_node.fw_tid),
-                ChakraAttr(name="op_schema", string_val=json_node.op_schema),
-                ChakraAttr(name="is_cpu_op", bool_val=not json_node.is_gpu_op()),
-            ]
-        )
+        inputs = protobuf_node.inputs
+        outputs = protobuf_node.outputs
+        (
+            inputs.values,
+            inputs.shapes,
+            inputs.types,
+            outputs.values,
+            outputs.shapes,
+            outputs.types,
+        ) = json_node.get_serialized_io()
+
+        # Attributes are created in place with add(). Constructing standalone messages and passing them to extend()
+        # or append() would copy every message into the repeated field once more.
+        attr = protobuf_node.attr
+        attr.add(name="rf_id", int64_val=json_node.rf_id)
+        attr.add(name="fw_parent", int64_val=json_node.fw_parent)
+        attr.add(name="seq_id", int64_val=json_node.seq_id)
+        attr.add(name="scope", int64_val=json_node.scope)
+        attr.add(name="tid", int64_val=json_node.tid)
+        attr.add(name="fw_tid", int64_val=json_node.fw_tid)
+        attr.add(name="op_schema", string_val=json_node.op_schema)
+        attr.add(name="is_cpu_op", bool_val=not json_node.is_gpu_op())
         if json_node.stream is not None:
-            protobuf_node.attr.append(ChakraAttr(name="stream", int64_val=json_node.stream))
+            attr.add(name="stream", int64_val=json_node.stream)
 
         return protobuf_node
 
@@ -326,20 +365,25 @@ class PyTorchConverter:
         Returns:
             int: The corresponding Chakra node type.
         """
-        if json_node.is_gpu_op():
-            if "ncclDevKernel_SendRecv" in json_node.name:
-                parent_node = json_node_map[json_node.parent]
-                keyword = (
-                    json_node_map[parent_node.parent].name
-                    if parent_node.name == "record_param_comms"
-                    else parent_node.name
-                )
-                if "send" in keyword:
-                    return COMM_SEND_NODE
-                if "recv" in keyword:
-                    return COMM_RECV_NODE
-            if "ncclKernel" in json_node.name or "ncclDevKernel" in json_node.name:
-                return COMM_COLL_NODE
+        if not json_node.is_gpu_op():
+            return COMP_NODE
+
+        name = json_node.name
+        # Most GPU operators are compute kernels. A single substring check rules them out before the NCCL checks.
+        if "nccl" not in name:
+            return COMP_NODE
+
+        if "ncclDevKernel_SendRecv" in name:
+            parent_node = json_node_map[json_node.parent]
+            keyword = (
+                json_node_map[parent_node.parent].name if parent_node.name == "record_param_comms" else parent_node.name
+            )
+            if "send" in keyword:
+                return COMM_SEND_NODE
+            if "recv" in keyword:
+                return COMM_RECV_NODE
+        if "ncclKernel" in name or "ncclDevKernel" in name:
+            return COMM_COLL_NODE
         return COMP_NODE
 
     def get_collective_comm_type(self, name: str) -> int:
@@ -403,10 +447,15 @@ class PyTorchConverter:
             protobuf_node_map (Dict[int, ChakraNode]): Dictionary of Chakra nodes.
             chakra_node (ChakraNode): The starting node for the traversal and dependency processing.
         """
+        get_json_node = json_node_map.get
+        get_protobuf_node = protobuf_node_map.get
         visited: Set[int] = set()
         stack: List[ChakraNode] = [chakra_node]
         last_visited_non_gpu: Optional[ChakraNode] = None
         last_visited_any: Optional[ChakraNode] = None
+        gpu_op_type = PyTorchNodeType.GPU_OP
+        # The debug messages below are emitted per edge, so skip building them entirely unless they will be logged.
+        debug_enabled = logging.getLogger().isEnabledFor(logging.DEBUG)
 
         while stack:
             current_node = stack.pop()
@@ -414,68 +463,72 @@ class PyTorchConverter:
                 continue
 
             visited.add(current_node.id)
-            json_node = json_node_map.get(current_node.id)
+            json_node = get_json_node(current_node.id)
             if not json_node:
                 continue
 
-            node_op_type = json_node.get_op_type()
-
-            if node_op_type == PyTorchNodeType.GPU_OP:
+            if json_node.get_op_type() is gpu_op_type:
                 if last_visited_any and last_visited_any.id not in current_node.data_deps:
                     current_node.data_deps.append(last_visited_any.id)
-                    logging.debug(
-                        f"GPU Node ID {current_node.id} now has a data dependency on Node ID {last_visited_any.id}"
-                    )
+                    if debug_enabled:
+                        logging.debug(
+                            f"GPU Node ID {current_node.id} now has a data dependency on Node ID {last_visited_any.id}"
+                        )
                 last_visited_any = last_visited_non_gpu
             else:
                 if json_node.inter_thread_dep:
                     dep_id = json_node.inter_thread_dep
                     if dep_id not in current_node.data_deps:
                         current_node.data_deps.append(dep_id)
-                        logging.debug(
-                            f"CPU Node ID {current_node.id} now has an inter-thread data dependency on Node ID "
-                            f"{dep_id}"
-                        )
+                        if debug_enabled:
+                            logging.debug(
+                                f"CPU Node ID {current_node.id} now has an inter-thread data dependency on Node ID "
+                                f"{dep_id}"
+                            )
                 if last_visited_non_gpu and last_visited_non_gpu.id not in current_node.data_deps:
                     current_node.data_deps.append(last_visited_non_gpu.id)
-                    logging.debug(
-                        f"CPU Node ID {current_node.id} now has a data dependency on non-GPU Node ID "
-                        f"{last_visited_non_gpu.id}"
-                    )
+                    if debug_enabled:
+                        logging.debug(
+                            f"CPU Node ID {current_node.id} now has a data dependency on non-GPU Node ID "
+                            f"{last_visited_non_gpu.id}"
+                        )
                 last_visited_non_gpu = current_node
                 last_visited_any = current_node
 
-            children_chakra_ids = [child.id for child in json_node.children]
-            for child_chakra_id in sorted(children_chakra_ids, reverse=True):
-                child_chakra_node = protobuf_node_map.get(child_chakra_id)
-                if child_chakra_node and child_chakra_node.id not in visited:
+            # Children are sorted by ID in establish_parent_child_relationships. Push them in reverse so that the
+            # child with the lowest ID, i.e., the earliest call, is popped first.
+            for child in reversed(json_node.children):
+                child_chakra_node = get_protobuf_node(child.id)
+                if child_chakra_node and child.id not in visited:
                     stack.append(child_chakra_node)
 
-    def remove_dangling_nodes(self, protobuf_node_map: Dict[int, ChakraNode]) -> Dict[int, ChakraNode]:
+    def remove_dangling_nodes(
+        self, protobuf_node_map: Dict[int, ChakraNode], parent_to_children_map: Dict[int, List[int]]
+    ) -> Dict[int, ChakraNode]:
         """
         Remove any dangling nodes from the protobuf_node_map dictionary.
 
         Dangling nodes are nodes that have neither children nor parents. These nodes are identified after the
         conversion and are typically unnecessary. Removing these nodes simplifies simulation and avoids potential
-        complications.
+        complications. Since dangling nodes appear in parent_to_children_map neither as parents nor as children, the
+        map remains valid after the removal.
 
         Args:
             protobuf_node_map (Dict[int, ChakraNode]): Dictionary of protobuf nodes.
+            parent_to_children_map (Dict[int, List[int]]): Mapping from parent node IDs to their child node IDs.
 
         Returns:
             Dict[int, ChakraNode]: Updated dictionary of protobuf nodes with dangling nodes removed.
         """
-        parent_ids = set()
-        for node in protobuf_node_map.values():
-            parent_ids.update(node.data_deps)
-
         dangling_nodes = [
-            node_id for node_id, node in protobuf_node_map.items() if node_id not in parent_ids and not node.data_deps
+            node_id
+            for node_id, node in protobuf_node_map.items()
+            if not node.data_deps and node_id not in parent_to_children_map
         ]
         for node_id in dangling_nodes:
             del protobuf_node_map[node_id]
 
-        if dangling_nodes:
+        if dangling_nodes and logging.getLogger().isEnabledFor(logging.DEBUG):
             logging.debug(f"Identified and removed {len(dangling_nodes)} dangling nodes:")
             for node_id in dangling_nodes:
                 logging.debug(f" - Node ID {node_id}")
@@ -496,69 +549,106 @@ class PyTorchConverter:
                 parent_to_children_map[dep_id].append(node_id)
         return parent_to_children_map
 
-    def identify_cyclic_dependencies(self, protobuf_node_map: Dict[int, ChakraNode]) -> None:
+    def identify_cyclic_dependencies(
+        self, protobuf_node_map: Dict[int, ChakraNode], parent_to_children_map: Dict[int, List[int]]
+    ) -> None:
         """
         Identify if there are any cyclic dependencies among protobuf nodes.
 
-        This method checks for cycles in the graph of protobuf nodes using a depth-first search (DFS) algorithm. It
-        logs an error message and raises an exception if a cycle is detected, ensuring the graph is a Directed Acyclic
-        Graph (DAG).
+        This method checks for cycles in the graph of protobuf nodes with Kahn's topological sort, which visits every
+        node and edge exactly once. Nodes that can never become dependency-free belong to or depend on a cycle. In that
+        case, an iterative depth-first search (DFS) over the remaining nodes extracts one cycle for the error message.
+        It logs an error message and raises an exception if a cycle is detected, ensuring the graph is a Directed
+        Acyclic Graph (DAG).
 
         Args:
             protobuf_node_map (Dict[int, ChakraNode]): Dictionary of protobuf nodes to check for cyclic dependencies.
+            parent_to_children_map (Dict[int, List[int]]): Mapping from parent node IDs to their child node IDs.
 
         Raises:
             Exception: If a cyclic dependency is detected among the protobuf nodes.
         """
-        visited = set()
-        stack = set()
-
-        def dfs(node_id: int, path: List[int]) -> bool:
-            """
-            Depth-first search to detect cycles.
-
-            Args:
-                node_id (int): The node ID to start the DFS from.
-                path (List[int]): The path traversed so far, for tracing the cycle.
-
-            Returns:
-                bool: True if a cycle is detected, False otherwise.
-            """
-            if node_id in stack:
-                cycle_nodes = " -> ".join([protobuf_node_map[n].name for n in path + [node_id]])
-                err_msg = (
-                    f"Cyclic dependency detected: {cycle_nodes}. The conversion failed because a cyclic dependency "
-                    f"was detected. Cyclic dependencies should not exist. The input and output traces must form a "
-                    f"Directed Acyclic Graph (DAG). This is essential for simulation; otherwise, simulators cannot "
-                    f"resolve the next dependency-free node and will hang. This indicates a bug in the conversion "
-                    f"process. Please investigate or report this issue on GitHub."
-                )
-                logging.error(err_msg)
-                return True
-            if node_id in visited:
-                return False
-
-            visited.add(node_id)
-            stack.add(node_id)
-            path.append(node_id)
-            for child_id in protobuf_node_map[node_id].data_deps:
-                if dfs(child_id, path.copy()):
-                    return True
-            stack.remove(node_id)
-            path.pop()
-            return False
-
-        for node_id in protobuf_node_map:
-            if dfs(node_id, []):
-                err_msg = (
-                    "Cyclic dependency detected. The conversion failed because a cyclic dependency "
-                    "was detected. Cyclic dependencies should not exist. The input and output traces must form a "
-                    "Directed Acyclic Graph (DAG). This is essential for simulation; otherwise, simulators cannot "
-                    "resolve the next dependency-free node and will hang. This indicates a bug in the conversion "
-                    "process. Please investigate or report this issue on GitHub."
-                )
-                logging.error(err_msg)
-                raise Exception(err_msg)
+        # Node IDs assigned by trace_link are dense, so the in-degree of each node is kept in a list indexed by node ID
+        # rather than in a dictionary. Traces with sparse node IDs, where such a list would be mostly empty or too large
+        # to allocate, fall back to a dictionary.
+        max_node_id = max(protobuf_node_map, default=-1)
+        in_degree: Union[List[int], Dict[int, int]]
+        if max_node_id < 2 * len(protobuf_node_map) + 1:
+            in_degree = [0] * (max_node_id + 1)
+        else:
+            in_degree = dict.fromkeys(protobuf_node_map, 0)
+        for node_id, node in protobuf_node_map.items():
+            in_degree[node_id] = sum(1 for dep_id in node.data_deps if dep_id in protobuf_node_map)
+
+        ready = deque(node_id for node_id in protobuf_node_map if in_degree[node_id] == 0)
+        num_sorted_nodes = 0
+        while ready:
+            node_id = ready.popleft()
+            num_sorted_nodes += 1
+            for dependent_id in parent_to_children_map.get(node_id, []):
+                in_degree[dependent_id] -= 1
+                if in_degree[dependent_id] == 0:
+                    ready.append(dependent_id)
+
+        if num_sorted_nodes == len(protobuf_node_map):
+            return
+
+        cycle = self.find_cycle(protobuf_node_map, in_degree)
+        cycle_nodes = " -> ".join(protobuf_node_map[node_id].name for node_id in cycle)
+        err_msg = (
+            f"Cyclic dependency detected: {cycle_nodes}. The conversion failed because a cyclic dependency "
+            f"was detected. Cyclic dependencies should not exist. The input and output traces must form a "
+            f"Directed Acyclic Graph (DAG). This is essential for simulation; otherwise, simulators cannot "
+            f"resolve the next dependency-free node and will hang. This indicates a bug in the conversion "
+            f"process. Please investigate or report this issue on GitHub."
+        )
+        logging.error(err_msg)
+        raise Exception(err_msg)
+
+    def find_cycle(
+        self, protobuf_node_map: Dict[int, ChakraNode], in_degree: Union[List[int], Dict[int, int]]
+    ) -> List[int]:
+        """
+        Find one cycle among nodes that could not be topologically sorted.
+
+        Every node left over by the topological sort has at least one data dependency that was also left over, so a
+        DFS that only follows such dependencies is guaranteed to reach a node that is already on the DFS stack.
+
+        Args:
+            protobuf_node_map (Dict[int, ChakraNode]): Dictionary of protobuf nodes.
+            in_degree (Union[List[int], Dict[int, int]]): Remaining in-degree of each node after the topological sort,
+                indexed by node ID. Nodes with a positive in-degree could not be sorted.
+
+        Returns:
+            List[int]: Node IDs forming the cycle, with the first node repeated at the end.
+        """
+        visited: Set[int] = set()
+        on_stack: Set[int] = set()
+        for start_id in protobuf_node_map:
+            if in_degree[start_id] == 0 or start_id in visited:
+                continue
+            path: List[int] = [start_id]
+            stack = [(start_id, iter(protobuf_node_map[start_id].data_deps))]
+            visited.add(start_id)
+            on_stack.add(start_id)
+            while stack:
+                node_id, deps = stack[-1]
+                for dep_id in deps:
+                    if dep_id not in protobuf_node_map or in_degree[dep_id] == 0:
+                        continue
+                    if dep_id in on_stack:
+                        return path[path.index(dep_id) :] + [dep_id]
+                    if dep_id not in visited:
+                        visited.add(dep_id)
+                        on_stack.add(dep_id)
+                        path.append(dep_id)
+                        stack.append((dep_id, iter(protobuf_node_map[dep_id].data_deps)))
+                        break
+                else:
+                    stack.pop()
+                    on_stack.discard(node_id)
+                    path.pop()
+        return []
 
     def write_protobuf_execution_trace(
         self,
@@ -569,7 +659,8 @@ class PyTorchConverter:
         """
         Write the Chakra execution trace by encoding global metadata and nodes.
 
-        Encode and write both the metadata and individual nodes to create a complete execution trace.
+        Encode and write both the metadata and individual nodes to create a complete execution trace. The metadata is
+        encoded into the same buffer as the nodes, so that it is written together with the first batch of nodes.
 
         Args:
             output_filename (str): The name of the output file for the protobuf execution trace.
@@ -579,60 +670,81 @@ class PyTorchConverter:
         logging.debug(f"Opening Chakra execution trace file: {output_filename}")
         with open(output_filename, "wb") as protobuf_et:
             logging.debug("Writing Chakra execution trace.")
-            self.write_global_metadata(protobuf_et, json_metadata)
-            self.encode_and_write_nodes(protobuf_et, protobuf_node_map)
+            buffer = bytearray()
+            self.encode_global_metadata(buffer, json_metadata)
+            self.encode_and_write_nodes(protobuf_et, protobuf_node_map, buffer)
             logging.debug("Chakra execution trace writing completed.")
 
-    def write_global_metadata(
+    def encode_global_metadata(
         self,
-        protobuf_et: IO[bytes],
+        buffer: bytearray,
         metadata: Dict,
     ) -> None:
         """
-        Encode and write global metadata for the Chakra execution trace.
+        Encode global metadata for the Chakra execution trace.
 
         Args:
-            protobuf_et (IO[bytes]): The output file handle for the protobuf execution trace.
+            buffer (bytearray): The buffer to append the encoded global metadata to.
             metadata (Dict): The metadata dictionary containing schema, pid, time, start_ts, and finish_ts.
         """
         logging.debug("Encoding global metadata for Chakra execution trace.")
-        global_metadata = GlobalMetadata(
-            attr=[
-                ChakraAttr(name="schema", string_val=metadata["schema"]),
-                ChakraAttr(name="pid", uint64_val=metadata["pid"]),
-                ChakraAttr(name="time", string_val=metadata["time"]),
-                ChakraAttr(name="start_ts", uint64_val=metadata["start_ts"]),
-                ChakraAttr(name="finish_ts", uint64_val=metadata["finish_ts"]),
-            ]
-        )
-        encode_message(protobuf_et, global_metadata)
+        global_metadata = GlobalMetadata()
+        attr = global_metadata.attr
+        attr.add(name="schema", string_val=metadata["schema"])
+        attr.add(name="pid", uint64_val=metadata["pid"])
+        attr.add(name="time", string_val=metadata["time"])
+        attr.add(name="start_ts", uint64_val=metadata["start_ts"])
+        attr.add(name="finish_ts", uint64_val=metadata["finish_ts"])
+        self.encode_message_into(buffer, global_metadata)
 
-    def encode_and_write_nodes(self, protobuf_et: IO[bytes], protobuf_node_map: Dict[int, ChakraNode]) -> None:
+    def encode_message_into(self, buffer: bytearray, message: Message) -> None:
+        """
+        Append a protobuf message to a buffer, framed with its varint-encoded length.
+
+        This produces the same layout as encode_message, but into a growing in-memory buffer instead of issuing
+        several small writes to a file per message.
+
+        Args:
+            buffer (bytearray): The buffer to append the framed message to.
+            message (Message): The protobuf message to encode.
+        """
+        serialized_message = message.SerializeToString()
+        buffer += _VarintBytes(len(serialized_message))
+        buffer += serialized_message
+
+    def encode_and_write_nodes(
+        self,
+        protobuf_et: IO[bytes],
+        protobuf_node_map: Dict[int, ChakraNode],
+        buffer: Optional[bytearray] = None,
+    ) -> None:
         """
         Encode and write nodes for the Chakra host + device execution trace in the protobuf format.
 
         Each node from the JSON execution trace is encoded and written into the protobuf format. This includes node
-        IDs, names, types, dependencies, and other attributes.
+        IDs, names, types, dependencies, and other attributes. The nodes are framed into an in-memory buffer with
+        encode_message_into, which is written to the output file whenever it grows beyond WRITE_BUFFER_SIZE.
 
         Args:
             protobuf_et (IO[bytes]): The output file handle for the protobuf execution trace.
             protobuf_node_map (Dict[int, ChakraNode]): Dictionary of protobuf nodes to be encoded and written.
+            buffer (Optional[bytearray]): Buffer holding already encoded messages that precede the nodes, such as the
+                global metadata. They are written to the output file together with the nodes.
         """
         logging.debug("Encoding and writing nodes for Chakra execution trace.")
-        seen_nids = set()
-        for nid in sorted(protobuf_node_map.keys()):
-            if nid in seen_nids:
-                err_msg = (
-                    f"Duplicate NID {nid} detected in Chakra nodes while writing nodes to the file. "
-                    f"Node IDs are expected to be unique, and encountering a duplicate indicates an issue in the "
-                    f"conversion process. Please check if the same node was registered twice. If not, report this "
-                    f"issue for further investigation."
-                )
-                logging.error(err_msg)
-                raise ValueError(err_msg)
-            seen_nids.add(nid)
-            chakra_node = protobuf_node_map[nid]
-            encode_message(protobuf_et, chakra_node)
+        if buffer is None:
+            buffer = bytearray()
+        encode_message_into = self.encode_message_into
+        # Node IDs are unique by construction because they are the keys of protobuf_node_map. Nodes are written in
+        # ascending ID order, which does not follow from insertion order since the JSON trace is not sorted by ID.
+        # This loop runs once per node of the trace; do not add logging to it, as even discarded debug messages are
+        # formatted and dominate the cost of writing each node. Log before or after the loop instead.
+        for _, chakra_node in sorted(protobuf_node_map.items()):
+            encode_message_into(buffer, chakra_node)
+            if len(buffer) >= self.WRITE_BUFFER_SIZE:
+                protobuf_et.write(buffer)
+                buffer.clear()
+        protobuf_et.write(buffer)
 
     # ruff: noqa: C901
     def simulate_execution(
@@ -654,49 +766,54 @@ class PyTorchConverter:
         """
         logging.debug("Simulating execution of Chakra nodes based on data dependencies.")
 
-        ready_cpu_nodes = [
-            (node_id, protobuf_node_map[node_id])
-            for node_id in protobuf_node_map
-            if not protobuf_node_map[node_id].data_deps and not json_node_map[node_id].is_gpu_op()
-        ]
-        ready_gpu_nodes = [
-            (node_id, protobuf_node_map[node_id])
-            for node_id in protobuf_node_map
-            if not protobuf_node_map[node_id].data_deps and json_node_map[node_id].is_gpu_op()
-        ]
-        ready_cpu_nodes.sort(key=lambda x: x[1].id)
-        ready_gpu_nodes.sort(key=lambda x: x[1].id)
+        # Ready CPU nodes are issued strictly in FIFO order, while ready GPU nodes can be issued from anywhere in
+        # the queue once their stream is free. A deque and an insertion-ordered dict keyed by node ID keep both
+        # operations O(1) instead of shifting a list on every issue. The initially ready nodes are collected and
+        # sorted by ID in a single pass, then split by device.
+        ready_cpu_nodes: Deque[Tuple[int, ChakraNode]] = deque()
+        ready_gpu_nodes: Dict[int, ChakraNode] = {}
+        for node_id, node in sorted(
+            ((node_id, node) for node_id, node in protobuf_node_map.items() if not node.data_deps),
+            key=lambda x: x[1].id,
+        ):
+            if json_node_map[node_id].is_gpu_op():
+                ready_gpu_nodes[node_id] = node
+            else:
+                ready_cpu_nodes.append((node_id, node))
 
         issued_nodes: Set[int] = set()
         current_cpu_node: Optional[Tuple[int, int]] = None
         current_gpu_nodes: Dict[int, Tuple[int, int]] = {}
 
         current_time: int = 0  # Simulated global clock in microseconds
+        debug_enabled = logging.getLogger().isEnabledFor(logging.DEBUG)
 
         while any([ready_cpu_nodes, ready_gpu_nodes, current_cpu_node, current_gpu_nodes]):
             if ready_cpu_nodes and not current_cpu_node:
-                cpu_node_id, cpu_node = ready_cpu_nodes.pop(0)
+                cpu_node_id, cpu_node = ready_cpu_nodes.popleft()
                 current_cpu_node = (cpu_node_id, current_time)
                 issued_nodes.add(cpu_node_id)
-                tid = json_node_map[cpu_node_id].tid
-                logging.debug(
-                    f"Issuing CPU Node ID {cpu_node_id} ({cpu_node.name}) at {current_time}us with duration "
-                    f"{cpu_node.duration_micros}us, tid: {tid}"
-                )
+                if debug_enabled:
+                    tid = json_node_map[cpu_node_id].tid
+                    logging.debug(
+                        f"Issuing CPU Node ID {cpu_node_id} ({cpu_node.name}) at {current_time}us with duration "
+                        f"{cpu_node.duration_micros}us, tid: {tid}"
+                    )
 
             if ready_gpu_nodes:
-                for gpu_node_id, gpu_node in ready_gpu_nodes[:]:
+                for gpu_node_id, gpu_node in list(ready_gpu_nodes.items()):
                     json_node = json_node_map[gpu_node_id]
                     stream_id = json_node.stream
                     if stream_id not in current_gpu_nodes:
-                        ready_gpu_nodes.remove((gpu_node_id, gpu_node))
+                        del ready_gpu_nodes[gpu_node_id]
                         current_gpu_nodes[stream_id] = (gpu_node_id, current_time)
                         issued_nodes.add(gpu_node_id)
-                        tid = f"stream {stream_id}"
-                        logging.debug(
-                            f"Issuing GPU Node ID {gpu_node_id} ({gpu_node.name}) at {current_time}us on stream "
-                            f"{stream_id} with duration {gpu_node.duration_micros}us, tid: {tid}"
-                        )
+                        if debug_enabled:
+                            tid = f"stream {stream_id}"
+                            logging.debug(
+                                f"Issuing GPU Node ID {gpu_node_id} ({gpu_node.name}) at {current_time}us on stream "
+                                f"{stream_id} with duration {gpu_node.duration_micros}us, tid: {tid}"
+                            )
 
             current_time += 1
 
@@ -704,18 +821,20 @@ class PyTorchConverter:
                 current_cpu_node
                 and current_time - current_cpu_node[1] >= protobuf_node_map[current_cpu_node[0]].duration_micros
             ):
-                cpu_node_id, _ = current_cpu_node
-                tid = json_node_map[cpu_node_id].tid
-                logging.debug(f"CPU Node ID {cpu_node_id} completed at {current_time}us, tid: {tid}")
+                if debug_enabled:
+                    cpu_node_id, _ = current_cpu_node
+                    tid = json_node_map[cpu_node_id].tid
+                    logging.debug(f"CPU Node ID {cpu_node_id} completed at {current_time}us, tid: {tid}")
                 current_cpu_node = None
 
             completed_streams = []
             for stream_id, (gpu_node_id, start_time) in current_gpu_nodes.items():
                 if current_time - start_time >= protobuf_node_map[gpu_node_id].duration_micros:
-                    logging.debug(
-                        f"GPU Node ID {gpu_node_id} on stream {stream_id} completed at {current_time}us, "
-                        f"tid: stream {stream_id}"
-                    )
+                    if debug_enabled:
+                        logging.debug(
+                            f"GPU Node ID {gpu_node_id} on stream {stream_id} completed at {current_time}us, "
+                            f"tid: stream {stream_id}"
+                        )
                     completed_streams.append(stream_id)
 
             for stream_id in completed_streams:
@@ -730,7 +849,7 @@ class PyTorchConverter:
                         if not json_node_map[child_id].is_gpu_op():
                             ready_cpu_nodes.append((child_id, child_node))
                         else:
-                            ready_gpu_nodes.append((child_id, child_node))
+                            ready_gpu_nodes[child_id] = child_node
 
             issued_nodes.clear()
 
@@ -1,6 +1,6 @@
 import traceback
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from .pytorch_tensor import PyTorchTensor
 
@@ -60,6 +60,8 @@ class PyTorchNode:
         self.gpu_children: List["PyTorchNode"] = []
         self.record_param_comms_node: Optional["PyTorchNode"] = None
         self.nccl_node: Optional["PyTorchNode"] = None
+        self._serialized_io: Optional[Tuple[str, str, str, str, str, str]] = None
+        self._op_type: Optional[PyTorchNodeType] = None
 
         self.parse_data(node_data)
 
@@ -113,19 +115,91 @@ class PyTorchNode:
         for attr in node_data.get("attrs", []):
             setattr(self, attr["name"], attr["value"])
 
+    def get_serialized_io(self) -> Tuple[str, str, str, str, str, str]:
+        """
+        Return the string representations of the values, shapes, and types of the inputs and outputs.
+
+        The strings are computed on the first call and cached, as serializing large input and output lists is
+        expensive.
+
+        Returns
+            Tuple[str, str, str, str, str, str]: Input values, input shapes, input types, output values, output shapes,
+                and output types.
+        """
+        if self._serialized_io is None:
+            self._serialized_io = (
+                str(self.inputs["values"]),
+                str(self.inputs["shapes"]),
+                str(self.inputs["types"]),
+                str(self.outputs["values"]),
+                str(self.outputs["shapes"]),
+                str(self.outputs["types"]),
+            )
+        return self._serialized_io
+
+    def share_serialized_io(self, other: "PyTorchNode") -> None:
+        """
+        Reuse the serialized inputs and outputs of another node if they are identical to the ones of this node.
+
+        GPU operators inherit the inputs and outputs of the CPU operator that launched them. Sharing the cached strings
+        avoids serializing the same lists once more. The lists are compared with is_same_json_value, which also
+        compares the types of the values, as values that compare equal, such as 1, 1.0, and True, are serialized
+        differently. Comparing the lists is still much cheaper than serializing them.
+
+        Args:
+            other (PyTorchNode): The node whose serialized inputs and outputs may be reused.
+        """
+        if (
+            self._serialized_io is None
+            and self.is_same_json_value(self.inputs, other.inputs)
+            and self.is_same_json_value(self.outputs, other.outputs)
+        ):
+            self._serialized_io = other.get_serialized_io()
+
+    @staticmethod
+    def is_same_json_value(value: Any, other: Any) -> bool:
+        """
+        Check if two values parsed from JSON have the same string representation without serializing them.
+
+        Args:
+            value (Any): The first value.
+            other (Any): The second value.
+
+        Returns:
+            bool: True if str(value) == str(other) is guaranteed, False otherwise.
+        """
+        if value is other:
+            return True
+        if type(value) is not type(other):
+            return False
+        if isinstance(value, list):
+            return len(value) == len(other) and all(map(PyTorchNode.is_same_json_value, value, other))
+        if isinstance(value, dict):
+            return value.keys() == other.keys() and all(
+                PyTorchNode.is_same_json_value(item, other[key]) for key, item in value.items()
+            )
+        if isinstance(value, float):
+            # 0.0 == -0.0, but the two are serialized differently.
+            return value.hex() == other.hex()
+        return value == other
+
     def get_op_type(self) -> PyTorchNodeType:
         """
         Determine the type of PyTorch operation.
 
+        The type is determined on the first call and cached, as it is queried repeatedly during the conversion.
+
         Returns
             PyTorchNodeType: The type of the PyTorch operation.
         """
-        if self.is_gpu_op():
-            return PyTorchNodeType.GPU_OP
-        elif hasattr(self, "op_schema") or hasattr(self, "outputs"):
-            return PyTorchNodeType.CPU_OP
-        else:
-            return PyTorchNodeType.LABEL
+        if self._op_type is None:
+            if self.is_gpu_op():
+                self._op_type = PyTorchNodeType.GPU_OP
+            elif hasattr(self, "op_schema") or hasattr(self, "outputs"):
+                self._op_type = PyTorchNodeType.CPU_OP
+            else:
+                self._op_type = PyTorchNodeType.LABEL
+        return self._op_type
 
     def is_cpu_op(self) -> bool:
         """
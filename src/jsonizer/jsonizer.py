@@ -1,16 +1,240 @@
 import argparse
+import gzip
+import mmap
+import os
+from contextlib import ExitStack, closing
+from typing import Any, BinaryIO, Callable, Dict, Iterator, Optional, Tuple, Union, cast
 
-from google.protobuf.json_format import MessageToJson
+import orjson
+from google.protobuf.internal.decoder import _DecodeVarint32
+from google.protobuf.json_format import MessageToDict
+from google.protobuf.message import DecodeError
 
 from ...schema.protobuf.et_def_pb2 import (
+    AttributeProto,
     GlobalMetadata,
+    IOInfo,
+    NodeType,
 )
 from ...schema.protobuf.et_def_pb2 import (
     Node as ChakraNode,
 )
-from ..third_party.utils.protolib import decodeMessage as decode_message
+from ..converter.protobuf_backend import warn_if_pure_python_protobuf
 from ..third_party.utils.protolib import openFileRd as open_file_rd
 
+# Number of bytes of a gzip-compressed trace to decompress at a time.
+DECOMPRESS_CHUNK_SIZE = 1024 * 1024
+
+# Number of bytes of JSON output to accumulate in memory before writing them to the output file.
+WRITE_BUFFER_SIZE = 4 * 1024 * 1024
+
+NODE_TYPE_NAMES: Dict[int, str] = {value.number: value.name for value in NodeType.DESCRIPTOR.values}
+
+
+def make_list_converter(converter: Callable[[Any], Any]) -> Callable[[Any], Dict[str, Any]]:
+    """
+    Make a converter from a repeated attribute value to its JSON representation.
+
+    Args:
+        converter (Callable[[Any], Any]): The converter for each element of the list.
+
+    Returns:
+        Callable[[Any], Dict[str, Any]]: The converter for the list message.
+    """
+
+    def convert_list(value_list: Any) -> Dict[str, Any]:
+        return {"values": [converter(value) for value in value_list.values]} if value_list.values else {}
+
+    return convert_list
+
+
+# Converters from scalar attribute values to their JSON representation, keyed by the name of the value type. Following
+# the proto3 JSON mapping, 64-bit integers are rendered as strings. Floating-point and bytes values are not listed here
+# because their mapping is more involved; attributes holding them are converted with MessageToDict.
+SCALAR_VALUE_CONVERTERS: Dict[str, Callable[[Any], Any]] = {
+    "int32": int,
+    "uint32": int,
+    "sint32": int,
+    "fixed32": int,
+    "sfixed32": int,
+    "int64": str,
+    "uint64": str,
+    "sint64": str,
+    "fixed64": str,
+    "sfixed64": str,
+    "bool": bool,
+    "string": str,
+}
+
+# Converters from attribute values to their JSON representation, keyed by the name of the AttributeProto value field.
+ATTR_VALUE_CONVERTERS: Dict[str, Callable[[Any], Any]] = {
+    **{f"{type_name}_val": converter for type_name, converter in SCALAR_VALUE_CONVERTERS.items()},
+    **{f"{type_name}_list": make_list_converter(converter) for type_name, converter in SCALAR_VALUE_CONVERTERS.items()},
+}
+
+
+def iter_message_frames(execution_trace: Union[gzip.GzipFile, BinaryIO]) -> Iterator[memoryview]:
+    """
+    Iterate over the serialized length-delimited messages of an execution trace opened with open_file_rd.
+
+    Uncompressed traces are memory-mapped, so that pages are read on demand without copying the file. Gzip-compressed
+    traces cannot be mapped. They are decompressed in chunks, and only the tail of a message that straddles two chunks
+    is carried over to the next one, so that neither memory nor disk use grows with the size of the trace.
+
+    Each frame refers to the buffer it was read from and must be released, for example with a with statement, before
+    the iterator is closed.
+
+    Args:
+        execution_trace (Union[gzip.GzipFile, BinaryIO]): The execution trace file handle.
+
+    Yields:
+        memoryview: The serialized message, without its length prefix.
+
+    Raises:
+        DecodeError: If the trace ends in the middle of a message.
+    """
+    if isinstance(execution_trace, gzip.GzipFile):
+        data = b""
+        pos = 0
+        while True:
+            chunk = execution_trace.read(DECOMPRESS_CHUNK_SIZE)
+            data = data[pos:] + chunk
+            pos = 0
+            data_view = memoryview(data)
+            frame = read_message_frame(data_view, pos)
+            while frame is not None:
+                start, pos = frame
+                yield data_view[start:pos]
+                frame = read_message_frame(data_view, pos)
+            if not chunk:
+                break
+        trailing_size = len(data) - pos
+    elif os.fstat(execution_trace.fileno()).st_size > 0:
+        with ExitStack() as stack:
+            trace_buffer = stack.enter_context(mmap.mmap(execution_trace.fileno(), 0, access=mmap.ACCESS_READ))
+            trace_view = stack.enter_context(memoryview(trace_buffer))
+            pos = 0
+            frame = read_message_frame(trace_view, pos)
+            while frame is not None:
+                start, pos = frame
+                yield trace_view[start:pos]
+                frame = read_message_frame(trace_view, pos)
+            trailing_size = len(trace_view) - pos
+    else:
+        trailing_size = 0
+    if trailing_size:
+        raise DecodeError(
+            f"The execution trace {execution_trace.name} is truncated: the last {trailing_size} bytes do not form a "
+            "complete message."
+        )
+
+
+def read_message_frame(buffer: memoryview, pos: int) -> Optional[Tuple[int, int]]:
+    """
+    Locate the length-delimited message starting at the given position of a buffer.
+
+    This is the in-memory counterpart of decode_message. The varint length prefix is decoded by the protobuf library,
+    so that the message can then be parsed from a slice of the buffer without first copying it into a separate bytes
+    object. A zero-length record is a valid frame; it starts and ends at the same position.
+
+    Args:
+        buffer (memoryview): The contents of the execution trace, or a part of them.
+        pos (int): Position of the length prefix of the message.
+
+    Returns:
+        Optional[Tuple[int, int]]: Start and end positions of the serialized message, or None if the buffer does not
+            hold a complete message at the given position. The end position is where the next message starts.
+    """
+    try:
+        size, start = _DecodeVarint32(buffer, pos)
+    except IndexError:
+        return None
+    if start + size > len(buffer):
+        return None
+    return start, start + size
+
+
+def attr_to_dict(attr: AttributeProto) -> Dict[str, Any]:
+    """
+    Convert an attribute to a dictionary with the same content as MessageToDict(preserving_proto_field_name=True).
+
+    Args:
+        attr (AttributeProto): The attribute to convert.
+
+    Returns:
+        Dict[str, Any]: The JSON-serializable representation of the attribute.
+    """
+    value_field = attr.WhichOneof("value")
+    if value_field is not None and value_field not in ATTR_VALUE_CONVERTERS:
+        return MessageToDict(attr, preserving_proto_field_name=True)
+
+    attr_dict: Dict[str, Any] = {}
+    if attr.name:
+        attr_dict["name"] = attr.name
+    if attr.doc_string:
+        attr_dict["doc_string"] = attr.doc_string
+    if value_field is not None:
+        attr_dict[value_field] = ATTR_VALUE_CONVERTERS[value_field](getattr(attr, value_field))
+    return attr_dict
+
+
+def io_info_to_dict(io_info: IOInfo) -> Dict[str, str]:
+    """
+    Convert input or output information to a dictionary with the same content as MessageToDict.
+
+    Args:
+        io_info (IOInfo): The input or output information to convert.
+
+    Returns:
+        Dict[str, str]: The JSON-serializable representation of the input or output information.
+    """
+    io_info_dict = {}
+    if io_info.values:
+        io_info_dict["values"] = io_info.values
+    if io_info.shapes:
+        io_info_dict["shapes"] = io_info.shapes
+    if io_info.types:
+        io_info_dict["types"] = io_info.types
+    return io_info_dict
+
+
+def encode_node_json(node: ChakraNode) -> bytes:  # noqa: C901
+    """
+    Encode a Chakra node as JSON.
+
+    The node fields are read directly instead of being discovered through descriptor reflection as MessageToDict
+    does for every message, which dominates the runtime on traces with millions of nodes. The output has the same
+    content as MessageToDict(preserving_proto_field_name=True), with fields in field-number order.
+
+    Args:
+        node (ChakraNode): The node to encode.
+
+    Returns:
+        bytes: The JSON representation of the node.
+    """
+    node_dict: Dict[str, Any] = {}
+    if node.id:
+        node_dict["id"] = str(node.id)
+    if node.name:
+        node_dict["name"] = node.name
+    if node.type:
+        node_dict["type"] = NODE_TYPE_NAMES.get(node.type, node.type)
+    if node.ctrl_deps:
+        node_dict["ctrl_deps"] = [str(dep) for dep in node.ctrl_deps]
+    if node.data_deps:
+        node_dict["data_deps"] = [str(dep) for dep in node.data_deps]
+    if node.start_time_micros:
+        node_dict["start_time_micros"] = str(node.start_time_micros)
+    if node.duration_micros:
+        node_dict["duration_micros"] = str(node.duration_micros)
+    if node.HasField("inputs"):
+        node_dict["inputs"] = io_info_to_dict(node.inputs)
+    if node.HasField("outputs"):
+        node_dict["outputs"] = io_info_to_dict(node.outputs)
+    if node.attr:
+        node_dict["attr"] = [attr_to_dict(attr) for attr in node.attr]
+    return orjson.dumps(node_dict)
+
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Converts Chakra execution trace to JSON format.")
@@ -20,17 +244,57 @@ def main() -> None:
     parser.add_argument(
         "--output_filename", type=str, required=True, help="Specifies the output filename for the JSON data."
     )
+    parser.add_argument(
+        "--format",
+        type=str,
+        choices=["json", "ndjson"],
+        default="json",
+        help=(
+            "Specifies the output format. 'json' writes a single JSON document with the metadata and a list of nodes. "
+            "'ndjson' writes one JSON object per line: the metadata on the first line, followed by one line per node."
+        ),
+    )
     args = parser.parse_args()
 
-    execution_trace = open_file_rd(args.input_filename)
+    warn_if_pure_python_protobuf("The jsonizer")
+
     node = ChakraNode()
-    with open(args.output_filename, "w") as file:
+    # The resources are released in reverse order, so the frame iterator, and with it any memory mapping of the trace,
+    # is closed before the trace file, even if the conversion fails part way through.
+    with ExitStack() as stack:
+        # open_file_rd is untyped, but it always opens the trace in binary mode.
+        execution_trace = cast(Union[gzip.GzipFile, BinaryIO], stack.enter_context(open_file_rd(args.input_filename)))
+        frames = stack.enter_context(closing(iter_message_frames(execution_trace)))
+        # The output is streamed one node at a time so that the whole JSON output never has to be held in memory.
+        file = stack.enter_context(open(args.output_filename, "wb"))
         global_metadata = GlobalMetadata()
-        decode_message(execution_trace, global_metadata)
-        file.write(MessageToJson(global_metadata))
-        while decode_message(execution_trace, node):
-            file.write(MessageToJson(node))
-    execution_trace.close()
+        frame = next(frames, None)
+        if frame is not None:
+            with frame:
+                global_metadata.ParseFromString(cast(bytes, frame))
+        metadata_json = orjson.dumps(MessageToDict(global_metadata, preserving_proto_field_name=True))
+        if args.format == "ndjson":
+            buffer = bytearray(metadata_json)
+            separator, node_separator, footer = b"\n", b"\n", b"\n"
+        else:
+            buffer = bytearray(b'{"metadata":')
+            buffer += metadata_json
+            buffer += b',"nodes":['
+            separator, node_separator, footer = b"", b",", b"]}"
+        for frame in frames:
+            with frame:
+                # Like decode_message, stop at the first zero-length node record.
+                if not frame.nbytes:
+                    break
+                node.ParseFromString(cast(bytes, frame))
+            buffer += separator
+            buffer += encode_node_json(node)
+            separator = node_separator
+            if len(buffer) >= WRITE_BUFFER_SIZE:
+                file.write(buffer)
+                buffer.clear()
+        buffer += footer
+        file.write(buffer)
 
 
 if __name__ == "__main__":
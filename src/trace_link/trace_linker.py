@@ -1,5 +1,4 @@
 import bisect
-import copy
 import json
 import logging
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -725,8 +724,9 @@ class TraceLinker:
         """
         Create and return a list of GPU operators that are dependent on a specific CPU operator.
 
-        The GPU operators are deep copies of the existing operators with updated IDs and other relevant
-        fields from the CPU operator.
+        The GPU operators are shallow copies of the CPU operator with updated IDs and other relevant fields. Nested
+        values such as inputs and outputs are shared with the CPU operator, as only top-level fields are rewritten
+        afterwards.
 
         Args:
             cpu_op (Dict): The Chakra host CPU operator.
@@ -740,7 +740,7 @@ class TraceLinker:
         updated_gpu_ops = []
         dependent_gpu_ops = host_op_id_to_kineto_ops_map.get(orig_op_id, [])
         for gpu_op in sorted(dependent_gpu_ops, key=lambda x: x.timestamp):
-            new_gpu_op = copy.deepcopy(cpu_op)
+            new_gpu_op = dict(cpu_op)
             new_gpu_op_id = self.id_assigner.generate_new_id()
             new_gpu_op.update(
                 {
@@ -31,11 +31,13 @@ class UniqueIdAssigner:
         Returns:
             int: A unique ID corresponding to the original ID.
         """
-        if original_id not in self.original_to_new_ids:
-            self.original_to_new_ids[original_id] = self.next_id
+        unique_id = self.original_to_new_ids.get(original_id)
+        if unique_id is None:
+            unique_id = self.next_id
+            self.original_to_new_ids[original_id] = unique_id
             self.next_id += 1
 
-        return self.original_to_new_ids[original_id]
+        return unique_id
 
     def generate_new_id(self) -> int:
         """
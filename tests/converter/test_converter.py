@@ -0,0 +1,22 @@
+import argparse
+from unittest.mock import MagicMock, patch
+
+import pytest
+from chakra.src.converter.converter import main
+
+
+@pytest.mark.parametrize("implementation_type, expect_warning", [("python", True), ("upb", False)])
+def test_main_warns_on_pure_python_protobuf(
+    monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture, implementation_type: str, expect_warning: bool
+) -> None:
+    monkeypatch.setattr("chakra.src.converter.protobuf_backend.api_implementation.Type", lambda: implementation_type)
+    convert = MagicMock()
+    args = argparse.Namespace(log_filename="debug.log", output="output.et", func=convert)
+
+    monkeypatch.setattr("chakra.src.converter.converter.setup_logging", MagicMock())
+
+    with patch("argparse.ArgumentParser.parse_args", return_value=args):
+        main()
+
+    convert.assert_called_once_with(args)
+    assert ("pure-Python protobuf implementation" in caplog.text) == expect_warning
@@ -1,4 +1,6 @@
+import io
 import json
+from pathlib import Path
 from typing import Dict
 from unittest.mock import MagicMock, mock_open, patch
 
@@ -11,10 +13,13 @@ from chakra.schema.protobuf.et_def_pb2 import (
     COMM_COLL_NODE,
     COMP_NODE,
     REDUCE_SCATTER,
+    GlobalMetadata,
 )
 from chakra.schema.protobuf.et_def_pb2 import Node as ChakraNode
 from chakra.src.converter.pytorch_converter import PyTorchConverter
 from chakra.src.converter.pytorch_node import PyTorchNode
+from chakra.src.third_party.utils.protolib import decodeMessage as decode_message
+from chakra.src.third_party.utils.protolib import encodeMessage as encode_message
 
 
 @pytest.fixture
@@ -79,12 +84,22 @@ def test_load_json_execution_traces(mock_file: MagicMock, sample_pytorch_data: D
     converter = PyTorchConverter()
     data = converter.load_json_execution_traces("input.json")
     assert data == sample_pytorch_data
-    mock_file.assert_called_once_with("input.json", "r")
+    mock_file.assert_called_once_with("input.json", "rb")
+
+
+@patch("builtins.open", new_callable=mock_open)
+def test_load_json_execution_traces_with_nan(mock_file: MagicMock, sample_pytorch_data: Dict) -> None:
+    sample_pytorch_data["nodes"][0]["inputs"]["values"] = [float("nan")]
+    mock_file.return_value.read.return_value = json.dumps(sample_pytorch_data).encode()
+    converter = PyTorchConverter()
+    data = converter.load_json_execution_traces("input.json")
+    assert data["nodes"][1] == sample_pytorch_data["nodes"][1]
+    assert data["nodes"][0]["inputs"]["values"][0] != data["nodes"][0]["inputs"]["values"][0]
 
 
 def test_parse_json_trace(sample_pytorch_data: Dict) -> None:
     converter = PyTorchConverter()
-    json_metadata, json_node_map = converter.parse_json_trace(sample_pytorch_data)
+    json_metadata, json_node_map, json_node_root_nids = converter.parse_json_trace(sample_pytorch_data)
 
     assert json_metadata["schema"] == "1.0.2-chakra.0.0.4"
     assert json_metadata["pid"] == 1234
@@ -94,6 +109,7 @@ def test_parse_json_trace(sample_pytorch_data: Dict) -> None:
     assert len(json_node_map) == 2
     assert json_node_map[1].id == 1
     assert json_node_map[2].id == 2
+    assert json_node_root_nids == []
 
 
 def create_sample_graph(parent_id: int = 0, expected_child_id: int = 0) -> Dict[int, PyTorchNode]:
@@ -118,6 +134,17 @@ def create_sample_graph(parent_id: int = 0, expected_child_id: int = 0) -> Dict[
     return {1: node1, 2: node2}
 
 
+def create_protobuf_node_map(data_deps: Dict[int, list]) -> Dict[int, ChakraNode]:
+    protobuf_node_map = {}
+    for node_id, deps in data_deps.items():
+        node = ChakraNode()
+        node.id = node_id
+        node.name = f"node{node_id}"
+        node.data_deps.extend(deps)
+        protobuf_node_map[node_id] = node
+    return protobuf_node_map
+
+
 @pytest.mark.parametrize("parent_id, expected_child_id", [(1, 2), (None, None)])
 def test_establish_parent_child_relationships(parent_id: int, expected_child_id: int) -> None:
     converter = PyTorchConverter()
@@ -131,9 +158,29 @@ def test_establish_parent_child_relationships(parent_id: int, expected_child_id:
         assert len(json_node_map[1].children) == 0
 
 
+def test_establish_parent_child_relationships_sorts_children() -> None:
+    converter = PyTorchConverter()
+    node_data = [
+        {
+            "id": node_id,
+            "name": f"node{node_id}",
+            "ctrl_deps": None if node_id == 1 else 1,
+            "inputs": {"values": [], "shapes": [], "types": []},
+            "outputs": {"values": [], "shapes": [], "types": []},
+            "attrs": [],
+        }
+        for node_id in [1, 4, 2, 3]
+    ]
+    json_node_map = {data["id"]: PyTorchNode("1.0.2-chakra.0.0.4", data) for data in node_data}
+
+    json_node_map = converter.establish_parent_child_relationships(json_node_map, [])
+
+    assert [child.id for child in json_node_map[1].children] == [2, 3, 4]
+
+
 def test_convert_json_to_protobuf_nodes(sample_pytorch_data: Dict) -> None:
     converter = PyTorchConverter()
-    json_metadata, json_node_map = converter.parse_json_trace(sample_pytorch_data)
+    json_metadata, json_node_map, json_node_root_nids = converter.parse_json_trace(sample_pytorch_data)
     json_node_map = converter.establish_parent_child_relationships(json_node_map, [])
     chakra_nodes = {}
     converter.convert_json_to_protobuf_nodes(json_node_map, chakra_nodes)
@@ -144,7 +191,7 @@ def test_convert_json_to_protobuf_nodes(sample_pytorch_data: Dict) -> None:
 
 def test_convert_ctrl_dep_to_data_dep(sample_pytorch_data: Dict) -> None:
     converter = PyTorchConverter()
-    json_metadata, json_node_map = converter.parse_json_trace(sample_pytorch_data)
+    json_metadata, json_node_map, json_node_root_nids = converter.parse_json_trace(sample_pytorch_data)
     json_node_map = converter.establish_parent_child_relationships(json_node_map, [])
     chakra_nodes = {}
     converter.convert_json_to_protobuf_nodes(json_node_map, chakra_nodes)
@@ -156,7 +203,7 @@ def test_convert_ctrl_dep_to_data_dep(sample_pytorch_data: Dict) -> None:
 @patch("builtins.open", new_callable=mock_open)
 def test_write_chakra_et(mock_file: MagicMock, sample_pytorch_data: Dict) -> None:
     converter = PyTorchConverter()
-    json_metadata, json_node_map = converter.parse_json_trace(sample_pytorch_data)
+    json_metadata, json_node_map, json_node_root_nids = converter.parse_json_trace(sample_pytorch_data)
     json_node_map = converter.establish_parent_child_relationships(json_node_map, [])
     chakra_nodes = {}
     converter.convert_json_to_protobuf_nodes(json_node_map, chakra_nodes)
@@ -164,12 +211,65 @@ def test_write_chakra_et(mock_file: MagicMock, sample_pytorch_data: Dict) -> Non
     assert mock_file().write.called
 
 
+@pytest.mark.parametrize("write_buffer_size", [1, 1024 * 1024])
+def test_write_protobuf_execution_trace(tmp_path: Path, write_buffer_size: int, sample_pytorch_data: Dict) -> None:
+    converter = PyTorchConverter()
+    converter.WRITE_BUFFER_SIZE = write_buffer_size
+    json_metadata, json_node_map, json_node_root_nids = converter.parse_json_trace(sample_pytorch_data)
+    chakra_nodes = {}
+    converter.convert_json_to_protobuf_nodes(json_node_map, chakra_nodes)
+    output_filename = tmp_path / "output.et"
+
+    converter.write_protobuf_execution_trace(str(output_filename), json_metadata, chakra_nodes)
+
+    with open(output_filename, "rb") as protobuf_et:
+        global_metadata = GlobalMetadata()
+        assert decode_message(protobuf_et, global_metadata)
+        assert {attr.name: attr.WhichOneof("value") for attr in global_metadata.attr} == {
+            "schema": "string_val",
+            "pid": "uint64_val",
+            "time": "string_val",
+            "start_ts": "uint64_val",
+            "finish_ts": "uint64_val",
+        }
+        assert global_metadata.attr[1].uint64_val == sample_pytorch_data["pid"]
+        decoded_ids = []
+        node = ChakraNode()
+        while decode_message(protobuf_et, node):
+            decoded_ids.append(node.id)
+    assert decoded_ids == sorted(chakra_nodes)
+
+
+@pytest.mark.parametrize("write_buffer_size", [1, 1024 * 1024])
+def test_encode_and_write_nodes(write_buffer_size: int) -> None:
+    converter = PyTorchConverter()
+    converter.WRITE_BUFFER_SIZE = write_buffer_size
+    protobuf_node_map = create_protobuf_node_map({3: [1], 1: [], 2: [1]})
+    protobuf_et = io.BytesIO()
+
+    converter.encode_and_write_nodes(protobuf_et, protobuf_node_map)
+
+    protobuf_et.seek(0)
+    decoded_ids = []
+    node = ChakraNode()
+    while decode_message(protobuf_et, node):
+        decoded_ids.append(node.id)
+    assert decoded_ids == [1, 2, 3]
+
+    expected_et = io.BytesIO()
+    for nid in sorted(protobuf_node_map):
+        encode_message(expected_et, protobuf_node_map[nid])
+    assert protobuf_et.getvalue() == expected_et.getvalue()
+
+
 @pytest.mark.parametrize(
     "pytorch_node_data, expected_type",
     [
         ({"name": "ncclKernel", "is_gpu_op": True}, COMM_COLL_NODE),
         ({"name": "ncclDevKernel", "is_gpu_op": True}, COMM_COLL_NODE),
         ({"name": "c10d::all_reduce", "is_gpu_op": True}, COMP_NODE),
+        ({"name": "volta_sgemm_128x64_nn", "is_gpu_op": True}, COMP_NODE),
+        ({"name": "ncclKernel", "is_gpu_op": False}, COMP_NODE),
         ({"name": "other_op", "is_gpu_op": False}, COMP_NODE),
     ],
 )
@@ -211,3 +311,51 @@ def test_get_collective_comm_type(name: str, expected_comm_type: int) -> None:
     converter = PyTorchConverter()
     comm_type = converter.get_collective_comm_type(name)
     assert comm_type == expected_comm_type
+
+
+def test_identify_cyclic_dependencies_dag() -> None:
+    converter = PyTorchConverter()
+    protobuf_node_map = create_protobuf_node_map({1: [], 2: [1], 3: [1, 2], 4: [3, 99]})
+    parent_to_children_map = converter.update_parent_to_children_map(protobuf_node_map)
+    converter.identify_cyclic_dependencies(protobuf_node_map, parent_to_children_map)
+
+
+def test_identify_cyclic_dependencies_cycle() -> None:
+    converter = PyTorchConverter()
+    protobuf_node_map = create_protobuf_node_map({1: [], 2: [1, 4], 3: [99, 2], 4: [3], 5: [4]})
+    parent_to_children_map = converter.update_parent_to_children_map(protobuf_node_map)
+    with pytest.raises(Exception, match="Cyclic dependency detected: node(2|3|4) -> node(2|3|4) -> node(2|3|4) -> "):
+        converter.identify_cyclic_dependencies(protobuf_node_map, parent_to_children_map)
+
+
+def test_identify_cyclic_dependencies_sparse_node_ids() -> None:
+    converter = PyTorchConverter()
+    protobuf_node_map = create_protobuf_node_map({1: [], 2**40: [1], 3: [2**40]})
+    parent_to_children_map = converter.update_parent_to_children_map(protobuf_node_map)
+    converter.identify_cyclic_dependencies(protobuf_node_map, parent_to_children_map)
+
+    protobuf_node_map = create_protobuf_node_map({1: [], 2**40: [1, 3], 3: [2**40]})
+    parent_to_children_map = converter.update_parent_to_children_map(protobuf_node_map)
+    with pytest.raises(Exception, match=f"Cyclic dependency detected: node({2**40}|3) -> node({2**40}|3) -> "):
+        converter.identify_cyclic_dependencies(protobuf_node_map, parent_to_children_map)
+
+
+def test_remove_dangling_nodes() -> None:
+    converter = PyTorchConverter()
+    protobuf_node_map = create_protobuf_node_map({1: [], 2: [1], 3: [], 4: [2]})
+    parent_to_children_map = converter.update_parent_to_children_map(protobuf_node_map)
+    protobuf_node_map = converter.remove_dangling_nodes(protobuf_node_map, parent_to_children_map)
+    assert list(protobuf_node_map.keys()) == [1, 2, 4]
+
+
+@pytest.mark.parametrize(
+    "node_name, expected_result",
+    [
+        ("[pytorch|profiler|execution_graph|thread]", True),
+        ("[pytorch|profiler|execution_trace|thread]", True),
+        ("aten::add", False),
+    ],
+)
+def test_is_root_node(node_name: str, expected_result: bool) -> None:
+    converter = PyTorchConverter()
+    assert converter.is_root_node(node_name) is expected_result
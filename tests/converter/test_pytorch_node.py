@@ -1,7 +1,7 @@
 import json
 import tarfile
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List
 
 import pytest
 from chakra.src.converter.pytorch_node import PyTorchNode
@@ -152,3 +152,50 @@ def test_pytorch_node_unsupported_schema(sample_node_data_unsupported_schema) ->
     schema = "9999.9999.9999-chakra.0.0.4"
     with pytest.raises(ValueError, match=f"Unsupported schema version '{schema}'"):
         PyTorchNode(schema, sample_node_data_unsupported_schema)
+
+
+def test_get_serialized_io(sample_node_data_1_0_2_chakra_0_0_4) -> None:
+    node = PyTorchNode("1.0.2-chakra.0.0.4", sample_node_data_1_0_2_chakra_0_0_4)
+    serialized_io = node.get_serialized_io()
+    assert serialized_io == ("values", "shapes", "types", "values", "shapes", "types")
+    assert node.get_serialized_io() is serialized_io
+
+
+def test_share_serialized_io(sample_node_data_1_0_2_chakra_0_0_4, sample_node_data_1_0_3_chakra_0_0_4) -> None:
+    cpu_node = PyTorchNode("1.0.2-chakra.0.0.4", sample_node_data_1_0_2_chakra_0_0_4)
+    gpu_node = PyTorchNode("1.0.2-chakra.0.0.4", dict(sample_node_data_1_0_2_chakra_0_0_4, id=3, cat="kernel"))
+    other_node = PyTorchNode("1.0.3-chakra.0.0.4", sample_node_data_1_0_3_chakra_0_0_4)
+
+    gpu_node.share_serialized_io(cpu_node)
+    other_node.share_serialized_io(cpu_node)
+
+    assert gpu_node.get_serialized_io() is cpu_node.get_serialized_io()
+    assert other_node.get_serialized_io() == ("[]", "[]", "[]", "[]", "[]", "[]")
+
+
+@pytest.mark.parametrize(
+    "values, other_values, same",
+    [
+        ([1, [2.5, "a"], None], [1, [2.5, "a"], None], True),
+        ([float("nan")], [float("nan")], True),
+        ([1], [1.0], False),
+        ([1], [True], False),
+        ([0.0], [-0.0], False),
+        ([[1, 2]], [[1, 2, 3]], False),
+        ([{"a": 1}], [{"a": 1.0}], False),
+    ],
+)
+def test_share_serialized_io_compares_types(
+    sample_node_data_1_0_2_chakra_0_0_4, values: List[Any], other_values: List[Any], same: bool
+) -> None:
+    inputs = {"values": values, "shapes": [], "types": []}
+    other_inputs = {"values": other_values, "shapes": [], "types": []}
+    cpu_node = PyTorchNode("1.0.2-chakra.0.0.4", dict(sample_node_data_1_0_2_chakra_0_0_4, inputs=inputs))
+    gpu_node = PyTorchNode(
+        "1.0.2-chakra.0.0.4", dict(sample_node_data_1_0_2_chakra_0_0_4, id=3, cat="kernel", inputs=other_inputs)
+    )
+
+    gpu_node.share_serialized_io(cpu_node)
+
+    assert (gpu_node.get_serialized_io() is cpu_node.get_serialized_io()) == same
+    assert gpu_node.get_serialized_io()[0] == str(other_values)
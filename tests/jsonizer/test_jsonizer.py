@@ -1,32 +1,177 @@
 import argparse
-import tempfile
-from unittest.mock import mock_open, patch
+import gzip
+from pathlib import Path
+from typing import IO, Callable
+from unittest.mock import patch
 
-from chakra.schema.protobuf.et_def_pb2 import GlobalMetadata
+import orjson
+import pytest
+from chakra.schema.protobuf.et_def_pb2 import COMM_COLL_NODE, COMP_NODE, GlobalMetadata, Int64List, IOInfo, StringList
+from chakra.schema.protobuf.et_def_pb2 import AttributeProto as ChakraAttr
 from chakra.schema.protobuf.et_def_pb2 import Node as ChakraNode
-from chakra.src.jsonizer.jsonizer import main
-from google.protobuf.json_format import MessageToJson
+from chakra.src.jsonizer.jsonizer import encode_node_json, iter_message_frames, main
+from chakra.src.third_party.utils.protolib import encodeMessage as encode_message
+from google.protobuf.json_format import MessageToDict
+from google.protobuf.message import DecodeError
 
 
-@patch("chakra.src.jsonizer.jsonizer.open_file_rd")
-@patch("chakra.src.jsonizer.jsonizer.decode_message")
-@patch("builtins.open", new_callable=mock_open)
-def test_main(mock_file_open, mock_decode_message, mock_open_file_rd) -> None:
+@pytest.mark.parametrize("output_format", ["json", "ndjson"])
+@pytest.mark.parametrize("write_buffer_size", [1, 4 * 1024 * 1024])
+@pytest.mark.parametrize("open_trace", [open, gzip.open])
+def test_main(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    open_trace: Callable[..., IO[bytes]],
+    write_buffer_size: int,
+    output_format: str,
+) -> None:
     """
     Tests the main function for converting Chakra execution trace to JSON format.
     """
-    with tempfile.NamedTemporaryFile(suffix=".json") as temp_output:
-        args = argparse.Namespace(input_filename="input_file", output_filename=temp_output.name)
-        mock_node = ChakraNode()
-        mock_global_metadata = GlobalMetadata()
+    monkeypatch.setattr("chakra.src.jsonizer.jsonizer.WRITE_BUFFER_SIZE", write_buffer_size)
+    global_metadata = GlobalMetadata(version="0.0.4")
+    nodes = [
+        ChakraNode(id=1, name="node1", data_deps=[]),
+        ChakraNode(id=2, name="node2", data_deps=[1], duration_micros=10),
+    ]
+    input_filename = tmp_path / "trace.et"
+    output_filename = tmp_path / "trace.json"
+    with open_trace(input_filename, "wb") as execution_trace:
+        encode_message(execution_trace, global_metadata)
+        for node in nodes:
+            encode_message(execution_trace, node)
 
-        mock_decode_message.side_effect = [mock_global_metadata, mock_node, False]
+    args = argparse.Namespace(
+        input_filename=str(input_filename), output_filename=str(output_filename), format=output_format
+    )
+    with patch("argparse.ArgumentParser.parse_args", return_value=args):
+        main()
 
-        with patch("argparse.ArgumentParser.parse_args", return_value=args):
-            main()
+    if output_format == "ndjson":
+        lines = output_filename.read_bytes().split(b"\n")
+        assert lines[-1] == b""
+        output = {"metadata": orjson.loads(lines[0]), "nodes": [orjson.loads(line) for line in lines[1:-1]]}
+    else:
+        output = orjson.loads(output_filename.read_bytes())
+    assert output["metadata"] == MessageToDict(global_metadata, preserving_proto_field_name=True)
+    assert output["nodes"] == [MessageToDict(node, preserving_proto_field_name=True) for node in nodes]
 
-        mock_open_file_rd.assert_called_with("input_file")
-        mock_decode_message.assert_called()
-        mock_file_open.assert_called_with(temp_output.name, "w")
-        mock_file_open().write.assert_any_call(MessageToJson(mock_global_metadata))
-        mock_file_open().write.assert_any_call(MessageToJson(mock_node))
+
+def test_main_warns_on_pure_python_protobuf(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+) -> None:
+    monkeypatch.setattr("chakra.src.converter.protobuf_backend.api_implementation.Type", lambda: "python")
+    input_filename = tmp_path / "trace.et"
+    output_filename = tmp_path / "trace.json"
+    input_filename.write_bytes(b"")
+
+    args = argparse.Namespace(input_filename=str(input_filename), output_filename=str(output_filename), format="json")
+    with patch("argparse.ArgumentParser.parse_args", return_value=args):
+        main()
+
+    assert "pure-Python protobuf implementation" in caplog.text
+
+
+@pytest.mark.parametrize("decompress_chunk_size", [1, 7, 1024 * 1024])
+@pytest.mark.parametrize("open_trace", [open, gzip.open])
+def test_iter_message_frames(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, open_trace: Callable[..., IO[bytes]], decompress_chunk_size: int
+) -> None:
+    monkeypatch.setattr("chakra.src.jsonizer.jsonizer.DECOMPRESS_CHUNK_SIZE", decompress_chunk_size)
+    messages = [GlobalMetadata(version="0.0.4"), ChakraNode(id=1, name="x" * 300), ChakraNode(), ChakraNode(id=2)]
+    input_filename = tmp_path / "trace.et"
+    with open_trace(input_filename, "wb") as execution_trace:
+        for message in messages:
+            encode_message(execution_trace, message)
+
+    with open_trace(input_filename, "rb") as execution_trace:
+        frames = []
+        for frame in iter_message_frames(execution_trace):
+            with frame:
+                frames.append(frame.tobytes())
+    assert frames == [message.SerializeToString() for message in messages]
+
+
+@pytest.mark.parametrize("trailing_bytes", [b"\x85", b"\x05abc"])
+@pytest.mark.parametrize("open_trace", [open, gzip.open])
+def test_iter_message_frames_truncated(
+    tmp_path: Path, open_trace: Callable[..., IO[bytes]], trailing_bytes: bytes
+) -> None:
+    node = ChakraNode(id=1, name="x")
+    input_filename = tmp_path / "trace.et"
+    with open_trace(input_filename, "wb") as execution_trace:
+        encode_message(execution_trace, node)
+        execution_trace.write(trailing_bytes)
+
+    with open_trace(input_filename, "rb") as execution_trace:
+        frames = iter_message_frames(execution_trace)
+        with next(frames) as frame:
+            assert frame.tobytes() == node.SerializeToString()
+        with pytest.raises(DecodeError, match=f"is truncated: the last {len(trailing_bytes)} bytes"):
+            next(frames)
+
+
+def test_main_empty_metadata(tmp_path: Path) -> None:
+    input_filename = tmp_path / "trace.et"
+    output_filename = tmp_path / "trace.json"
+    node = ChakraNode(id=1, name="x")
+    with open(input_filename, "wb") as execution_trace:
+        encode_message(execution_trace, GlobalMetadata())
+        encode_message(execution_trace, node)
+
+    args = argparse.Namespace(input_filename=str(input_filename), output_filename=str(output_filename), format="json")
+    with patch("argparse.ArgumentParser.parse_args", return_value=args):
+        main()
+
+    assert orjson.loads(output_filename.read_bytes()) == {
+        "metadata": {},
+        "nodes": [MessageToDict(node, preserving_proto_field_name=True)],
+    }
+
+
+def test_main_empty_trace(tmp_path: Path) -> None:
+    input_filename = tmp_path / "trace.et"
+    output_filename = tmp_path / "trace.json"
+    input_filename.write_bytes(b"")
+
+    args = argparse.Namespace(input_filename=str(input_filename), output_filename=str(output_filename), format="json")
+    with patch("argparse.ArgumentParser.parse_args", return_value=args):
+        main()
+
+    assert orjson.loads(output_filename.read_bytes()) == {"metadata": {}, "nodes": []}
+
+
+@pytest.mark.parametrize(
+    "node",
+    [
+        ChakraNode(),
+        ChakraNode(id=1, name="node1", type=COMP_NODE, inputs=IOInfo()),
+        ChakraNode(
+            id=2**63,
+            name="node2",
+            type=COMM_COLL_NODE,
+            ctrl_deps=[1],
+            data_deps=[1, 2**40],
+            start_time_micros=5,
+            duration_micros=10,
+            inputs=IOInfo(values="[1]", shapes="[[2, 3]]", types='["Tensor(float)"]'),
+            outputs=IOInfo(shapes="[[]]"),
+            attr=[
+                ChakraAttr(name="rf_id", int64_val=-7),
+                ChakraAttr(name="zero", int64_val=0),
+                ChakraAttr(name="pid", uint64_val=2**64 - 1),
+                ChakraAttr(name="rank", int32_val=-3),
+                ChakraAttr(name="is_cpu_op", bool_val=False),
+                ChakraAttr(name="op_schema", string_val=""),
+                ChakraAttr(name="dims", int64_list=Int64List(values=[1, -2])),
+                ChakraAttr(name="empty", int64_list=Int64List()),
+                ChakraAttr(name="names", string_list=StringList(values=["a", "b"])),
+                ChakraAttr(name="scale", double_val=0.5, doc_string="falls back to MessageToDict"),
+                ChakraAttr(name="blob", bytes_val=b"\x00\x01"),
+                ChakraAttr(name="unset"),
+            ],
+        ),
+    ],
+)
+def test_encode_node_json(node: ChakraNode) -> None:
+    assert orjson.loads(encode_node_json(node)) == MessageToDict(node, preserving_proto_field_name=True)